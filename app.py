@@ -2,7 +2,6 @@
 app.py -- Bayview Counseling Lead Dashboard
 """
 
-import json
 import os
 import logging
 import threading
@@ -30,8 +29,9 @@ init_cache_db()
 
 # -- State ---------------------------------------------------------------------
 _lock = threading.Lock()
+_refresh_lock = threading.Lock()
+_refresh_requested = False
 _data_json = None
-_data_dict = None
 _last_refresh = None
 _loading = False
 
@@ -81,15 +81,34 @@ def _load_redis():
 
 # -- Data loading --------------------------------------------------------------
 def _do_refresh():
-    global _data_json, _data_dict, _last_refresh, _loading
+    global _refresh_requested
+    # Scheduler, startup and /api/refresh can overlap. A request that arrives
+    # mid-run may carry edits the run has already read past, so queue one
+    # follow-up run instead of dropping it. The flag is set and checked under
+    # _lock so it can't be missed between the last check and the release.
+    with _lock:
+        if not _refresh_lock.acquire(blocking=False):
+            _refresh_requested = True
+            logger.info("Refresh already in progress, queued a follow-up run")
+            return
+    while True:
+        _run_refresh()
+        with _lock:
+            if not _refresh_requested:
+                _refresh_lock.release()
+                return
+            _refresh_requested = False
+
+
+def _run_refresh():
+    global _data_json, _last_refresh, _loading
     logger.info("Fetching data from Google Sheets...")
     try:
-        from data_processor import generate_data
+        from data_processor import generate_data, dumps
         data = generate_data()
-        js = json.dumps(data, separators=(",", ":"))
+        js = dumps(data)
         with _lock:
             _data_json = js
-            _data_dict = data
             _last_refresh = datetime.now()
             _loading = False
         _save_redis(js)
@@ -103,7 +122,7 @@ def _do_refresh():
 
 
 def _ensure_loaded():
-    global _data_json, _data_dict, _last_refresh, _loading
+    global _data_json, _last_refresh, _loading
     with _lock:
         if _data_json is not None or _loading:
             return
@@ -114,7 +133,6 @@ def _ensure_loaded():
     if cached:
         with _lock:
             _data_json = cached
-            _data_dict = json.loads(cached)
             _last_refresh = datetime.fromisoformat(ts) if ts else datetime.now()
             _loading = False
         logger.info("Serving from Redis cache")
@@ -126,7 +144,6 @@ def _ensure_loaded():
     if cached:
         with _lock:
             _data_json = cached
-            _data_dict = json.loads(cached)
             _last_refresh = datetime.fromisoformat(ts) if ts else datetime.now()
             _loading = False
         logger.info("Serving from SQLite cache (last updated: %s)", ts)
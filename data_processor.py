@@ -7,15 +7,25 @@ import csv
 import json
 import io
 import logging
+import re
+import sys
 
 try:
     from database import get_leads_for_dashboard, get_all_rental_entries
     HAS_DB = True
 except ImportError:
     HAS_DB = False
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 import requests
 from datetime import datetime, timedelta, date
-from collections import Counter, defaultdict
+from collections import Counter, defaultdict, namedtuple
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +44,14 @@ ROOM_RENTAL = 40
 AVG_SESSIONS = 3
 THERAPY_REV = ROOM_RENTAL * AVG_SESSIONS
 TESTING_REV = 1500
+CASHFLOW_SCENARIOS = {"low": 1, "med": 2, "high": 4}  # sessions per booked therapy client
+
+LEAD_COLS = 15  # Timestamp … Location; the export trims trailing empty cells
+CSV_CHUNK_SIZE = 100 * 1024
+
+# One record per lead from either source; a tuple is far lighter than a dict per row
+Lead = namedtuple("Lead", "date ym y service testing problem source action "
+                          "team_member outcome booked marketing location")
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -42,43 +60,92 @@ TESTING_REV = 1500
 
 def fetch_csv(url: str) -> list[list[str]]:
     logger.info("Fetching %s …", url[:80])
-    resp = requests.get(url, timeout=30, headers={"User-Agent": "BayviewDashboard/1.0"})
-    resp.raise_for_status()
-    reader = csv.reader(io.StringIO(resp.text))
-    rows = list(reader)
+    # Parse as the body streams in rather than buffering it all in resp.text first
+    with requests.get(url, timeout=30, stream=True,
+                      headers={"User-Agent": "BayviewDashboard/1.0"}) as resp:
+        resp.raise_for_status()
+        resp.raw.decode_content = True
+        resp.raw.auto_close = False  # let TextIOWrapper see EOF instead of a closed stream
+        body = io.TextIOWrapper(io.BufferedReader(resp.raw, buffer_size=CSV_CHUNK_SIZE),
+                                encoding="utf-8", newline="")
+        rows = list(csv.reader(body))
     logger.info("  → %d rows", len(rows))
     return rows
 
 
+# Same fields strptime accepts for "%m/%d/%Y" and "%Y-%m-%d"
+_MDY_RE = re.compile(r"(1[0-2]|0[1-9]|[1-9])/(3[01]|[12]\d|0[1-9]|[1-9]| [1-9])/(\d{4})")
+_YMD_RE = re.compile(r"(\d{4})-(1[0-2]|0[1-9]|[1-9])-(3[01]|[12]\d|0[1-9]|[1-9]| [1-9])")
+
+
+@lru_cache(maxsize=8192)
+def _parse_date_str(s: str):
+    # Pick the format from the separator rather than letting strptime retry
+    if "/" in s:
+        m = _MDY_RE.fullmatch(s)
+        if not m:
+            return None
+        mo, d, y = m.groups()
+    else:
+        m = _YMD_RE.fullmatch(s)
+        if not m:
+            return None
+        y, mo, d = m.groups()
+    try:
+        return date(int(y), int(mo), int(d))
+    except ValueError:
+        return None
+
+
 def parse_date(s: str):
-    if not s or not s.strip():
+    if not s:
         return None
-    s = s.strip()
-    for fmt in ("%m/%d/%Y", "%Y-%m-%d"):
-        try:
-            dt = datetime.strptime(s, fmt).date()
-            if 2017 <= dt.year <= date.today().year + 1:
-                return dt
-            return None
-        except ValueError:
-            continue
+    dt = _parse_date_str(s.strip())
+    # Range check stays outside the cache so it tracks today's year
+    if dt and 2017 <= dt.year <= date.today().year + 1:
+        return dt
     return None
 
 
+@lru_cache(maxsize=4096)
 def parse_dollar(s: str) -> float:
-    if not s or not s.strip():
+    # Rental cells repeat the same few amounts, hence the cache; float() already
+    # tolerates surrounding whitespace, so only the $ and , need stripping
+    if not s:
         return 0.0
-    s = s.strip().replace("$", "").replace(",", "")
+    if "$" in s or "," in s:
+        s = s.replace("$", "").replace(",", "")
     try:
         return float(s)
     except ValueError:
         return 0.0
 
 
+@lru_cache(maxsize=1024)
+def period_keys(year: int, month: int) -> tuple[str, str]:
+    # One shared ("YYYY-MM", "YYYY") pair per month instead of fresh strings per lead
+    return f"{year:04d}-{month:02d}", str(year)
+
+
+def _json_default(obj):
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+def dumps(data) -> str:
+    """Serialize dashboard data to compact JSON, emitting dates as ISO-8601."""
+    if HAS_ORJSON:
+        return orjson.dumps(data).decode()
+    return json.dumps(data, separators=(",", ":"), default=_json_default)
+
+
 # ──────────────────────────────────────────────────────────────────────────────
-# Normalizers
+# Normalizers — pure functions over a small set of distinct cell values, so
+# each is memoized and repeated inputs cost a dict lookup
 # ──────────────────────────────────────────────────────────────────────────────
 
+@lru_cache(maxsize=4096)
 def normalize_location(loc: str) -> str:
     if not loc:
         return "Unknown"
@@ -95,6 +162,7 @@ def normalize_location(loc: str) -> str:
     return loc if loc else "Unknown"
 
 
+@lru_cache(maxsize=4096)
 def normalize_service(svc: str):
     if not svc:
         return None
@@ -124,6 +192,7 @@ def normalize_service(svc: str):
     return svc.strip()
 
 
+@lru_cache(maxsize=4096)
 def is_testing_service(svc: str) -> bool:
     if not svc:
         return False
@@ -131,6 +200,7 @@ def is_testing_service(svc: str) -> bool:
     return "testing" in lo or "evaluation" in lo or "cogscreen" in lo
 
 
+@lru_cache(maxsize=4096)
 def normalize_source(src: str) -> str:
     if not src:
         return "Unknown"
@@ -169,6 +239,12 @@ def normalize_source(src: str) -> str:
     return src
 
 
+_NEVER_BOOKED_RE = re.compile("|".join(map(re.escape, (
+    "no response", "never booked", "no answer", "did not book",
+    "not interested", "looking for", "insurance", "wrong number", "voicemail"))))
+
+
+@lru_cache(maxsize=4096)
 def normalize_outcome(outcome: str) -> str:
     if not outcome:
         return "Unknown"
@@ -176,8 +252,7 @@ def normalize_outcome(outcome: str) -> str:
     lo = outcome.lower()
     if lo in ("booked", "boked"):
         return "Booked"
-    if any(k in lo for k in ("no response", "never booked", "no answer", "did not book",
-                              "not interested", "looking for", "insurance", "wrong number", "voicemail")):
+    if _NEVER_BOOKED_RE.search(lo):
         return "Never Booked"
     if lo.startswith("called") or ("called" in lo and len(outcome) < 20):
         return "Called"
@@ -192,6 +267,7 @@ def normalize_outcome(outcome: str) -> str:
     return outcome
 
 
+@lru_cache(maxsize=4096)
 def normalize_team_member(name: str):
     if not name:
         return None
@@ -201,6 +277,7 @@ def normalize_team_member(name: str):
     return name
 
 
+@lru_cache(maxsize=4096)
 def get_action(action: str):
     if not action:
         return None
@@ -222,17 +299,8 @@ def get_action(action: str):
 # Aggregation helpers
 # ──────────────────────────────────────────────────────────────────────────────
 
-def count_top(items, n=20):
-    return [{"name": k, "count": v} for k, v in Counter(items).most_common(n)]
-
-
-def count_top_locs(items, n=5):
-    loc_leads, loc_booked = Counter(), Counter()
-    for loc, booked in items:
-        loc_leads[loc] += 1
-        if booked:
-            loc_booked[loc] += 1
-    return [{"name": l, "leads": c, "booked": loc_booked.get(l, 0)} for l, c in loc_leads.most_common(n)]
+def count_top(counter, n=20):
+    return [{"name": k, "count": v} for k, v in counter.most_common(n)]
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -241,60 +309,79 @@ def count_top_locs(items, n=5):
 
 def build_period(leads, prev_leads=None):
     total = len(leads)
-    booked = sum(1 for l in leads if l["booked"])
-    booking_rate = round(booked / total * 100) if total else 0
+    booked = 0
+    daily_m = defaultdict(lambda: [0, 0])  # [leads, booked]
+    mon_m = defaultdict(lambda: [0, 0])
+    yr_m = defaultdict(lambda: [0, 0])
+    loc_c, loc_b = Counter(), Counter()
+    src_c, svc_c, prob_c = Counter(), Counter(), Counter()
+    out_c, act_c, mkt_c = Counter(), Counter(), Counter()
+    tm = defaultdict(lambda: {"leads": 0, "booked": 0, "mkt": False})
+    therapy_booked = testing_booked = therapy_total = testing_total = 0
 
-    loc_c = Counter(l["location"] for l in leads)
-    src_c = Counter(l["source"] for l in leads)
-    svc_c = Counter(l["service"] for l in leads if l["service"])
+    # Single pass over the slice feeds every aggregate below
+    for l in leads:
+        b = l.booked
+        booked += b
+        dm = daily_m[l.date]
+        dm[0] += 1
+        dm[1] += b
+        mm = mon_m[l.ym]
+        mm[0] += 1
+        mm[1] += b
+        ym = yr_m[l.y]
+        ym[0] += 1
+        ym[1] += b
+
+        loc = l.location
+        loc_c[loc] += 1
+        if b:
+            loc_b[loc] += 1
+        src_c[l.source] += 1
+        out_c[l.outcome] += 1
+        if l.service:
+            svc_c[l.service] += 1
+        if l.problem:
+            prob_c[l.problem] += 1
+        if l.action:
+            act_c[l.action] += 1
+        mkt = l.marketing
+        if mkt:
+            mkt_c[mkt] += 1
+
+        if l.team_member:
+            t = tm[l.team_member]
+            t["leads"] += 1
+            if b:
+                t["booked"] += 1
+            if mkt == "Yes":
+                t["mkt"] = True
+
+        if l.testing:
+            testing_total += 1
+            testing_booked += b
+        else:
+            therapy_total += 1
+            therapy_booked += b
+
+    booking_rate = round(booked / total * 100) if total else 0
     top_loc = loc_c.most_common(1)[0] if loc_c else ("Unknown", 0)
     top_src = src_c.most_common(1)[0] if src_c else ("Unknown", 0)
     top_svc = svc_c.most_common(1)[0] if svc_c else ("Unknown", 0)
 
-    # Daily
-    daily_m = defaultdict(lambda: {"leads": 0, "booked": 0})
-    for l in leads:
-        d = l["date"].isoformat()
-        daily_m[d]["leads"] += 1
-        if l["booked"]:
-            daily_m[d]["booked"] += 1
-    daily = [{"date": k, **v} for k, v in sorted(daily_m.items())]
-
-    # Monthly
-    mon_m = defaultdict(lambda: {"leads": 0, "booked": 0})
-    for l in leads:
-        m = l["date"].strftime("%Y-%m")
-        mon_m[m]["leads"] += 1
-        if l["booked"]:
-            mon_m[m]["booked"] += 1
-    monthly = [{"month": k, **v} for k, v in sorted(mon_m.items())]
-
-    # Yearly
-    yr_m = defaultdict(lambda: {"leads": 0, "booked": 0})
-    for l in leads:
-        y = str(l["date"].year)
-        yr_m[y]["leads"] += 1
-        if l["booked"]:
-            yr_m[y]["booked"] += 1
-    yearly = [{"year": k, **v} for k, v in sorted(yr_m.items())]
-
-    locations = count_top_locs([(l["location"], l["booked"]) for l in leads])
-    services = count_top([l["service"] for l in leads if l["service"]], 15)
-    problems = count_top([l["problem"] for l in leads if l["problem"]], 15)
-    sources = count_top([l["source"] for l in leads], 20)
-    outcomes = count_top([l["outcome"] for l in leads], 40)
-    actions = count_top([l["action"] for l in leads if l["action"]], 10)
-    marketing = count_top([l["marketing"] for l in leads if l["marketing"]])
+    daily = [{"date": k, "leads": v[0], "booked": v[1]} for k, v in sorted(daily_m.items())]
+    monthly = [{"month": k, "leads": v[0], "booked": v[1]} for k, v in sorted(mon_m.items())]
+    yearly = [{"year": k, "leads": v[0], "booked": v[1]} for k, v in sorted(yr_m.items())]
+
+    locations = [{"name": l, "leads": c, "booked": loc_b.get(l, 0)} for l, c in loc_c.most_common(5)]
+    services = count_top(svc_c, 15)
+    problems = count_top(prob_c, 15)
+    sources = count_top(src_c, 20)
+    outcomes = count_top(out_c, 40)
+    actions = count_top(act_c, 10)
+    marketing = count_top(mkt_c)
 
     # Team
-    tm = defaultdict(lambda: {"leads": 0, "booked": 0, "mkt": False})
-    for l in leads:
-        if l["team_member"]:
-            tm[l["team_member"]]["leads"] += 1
-            if l["booked"]:
-                tm[l["team_member"]]["booked"] += 1
-            if l["marketing"] == "Yes":
-                tm[l["team_member"]]["mkt"] = True
     NON_TEAM_NAMES = {"insurance", "medicaid", "pending", "medicare"}
     all_team = sorted(
         [{"name": n, "leads": d["leads"], "booked": d["booked"],
@@ -306,12 +393,6 @@ def build_period(leads, prev_leads=None):
     referrals = [t for t in all_team if t["name"].lower() in {"insurance", "medicaid", "medicare"}]
     pending = [t for t in all_team if t["name"].lower() == "pending"]
 
-    # Revenue
-    therapy_booked = sum(1 for l in leads if l["booked"] and not is_testing_service(l.get("service_raw", "")))
-    testing_booked = sum(1 for l in leads if l["booked"] and is_testing_service(l.get("service_raw", "")))
-    therapy_total = sum(1 for l in leads if not is_testing_service(l.get("service_raw", "")))
-    testing_total = sum(1 for l in leads if is_testing_service(l.get("service_raw", "")))
-
     result = {
         "total": total, "booked": booked, "bookingRate": booking_rate,
         "topLocation": {"name": top_loc[0], "count": top_loc[1]},
@@ -328,7 +409,7 @@ def build_period(leads, prev_leads=None):
     }
     if prev_leads is not None:
         pt = len(prev_leads)
-        pb = sum(1 for l in prev_leads if l["booked"])
+        pb = sum([l.booked for l in prev_leads])
         result["prev"] = {"total": pt, "booked": pb,
                           "bookingRate": round(pb / pt * 100) if pt else 0}
     return result
@@ -344,33 +425,33 @@ def convert_db_leads():
     """Fetch leads from SQLite DB and convert to same format as CSV-parsed leads."""
     if not HAS_DB:
         return []
+    # Rows stream from the cursor, so query errors surface while iterating
+    leads = []
     try:
-        db_rows = get_leads_for_dashboard()
+        for row in get_leads_for_dashboard():
+            dt = parse_date(row["date"])
+            if not dt:
+                continue
+            svc_raw = row["service_type"]
+            out_raw = row["referral_outcome"]
+            booked = out_raw.lower() in ("booked", "boked") if out_raw else False
+            ym, y = period_keys(dt.year, dt.month)
+            leads.append(Lead(
+                date=dt, ym=ym, y=y,
+                service=normalize_service(svc_raw) if svc_raw else None,
+                testing=is_testing_service(svc_raw),
+                problem=row["presenting_problem"] or None,
+                source=normalize_source(row["referral_source"]) if row["referral_source"] else "Unknown",
+                action=get_action(row["action_taken"]) if row["action_taken"] else None,
+                team_member=normalize_team_member(row["referred_to"]) if row["referred_to"] else None,
+                outcome=normalize_outcome(out_raw) if out_raw else "Unknown",
+                booked=booked,
+                marketing=row["marketing_program"] or None,
+                location=normalize_location(row["location"]) if row["location"] else "Unknown",
+            ))
     except Exception as e:
         logger.warning("Could not load DB leads: %s", e)
         return []
-
-    leads = []
-    for row in db_rows:
-        dt = parse_date(row.get("date", ""))
-        if not dt:
-            continue
-        svc_raw = row.get("service_type", "")
-        out_raw = row.get("referral_outcome", "")
-        booked = out_raw.lower() in ("booked", "boked") if out_raw else False
-        leads.append({
-            "date": dt,
-            "service": normalize_service(svc_raw) if svc_raw else None,
-            "service_raw": svc_raw,
-            "problem": row.get("presenting_problem") or None,
-            "source": normalize_source(row.get("referral_source", "")) if row.get("referral_source") else "Unknown",
-            "action": get_action(row.get("action_taken", "")) if row.get("action_taken") else None,
-            "team_member": normalize_team_member(row.get("referred_to", "")) if row.get("referred_to") else None,
-            "outcome": normalize_outcome(out_raw) if out_raw else "Unknown",
-            "booked": booked,
-            "marketing": row.get("marketing_program") or None,
-            "location": normalize_location(row.get("location", "")) if row.get("location") else "Unknown",
-        })
     logger.info("Loaded %d leads from custom DB", len(leads))
     return leads
 
@@ -380,28 +461,37 @@ def convert_db_leads():
 
 def process_leads(rows):
     leads = []
+    pad = [""] * LEAD_COLS
     for row in rows[1:]:
         if len(row) < 11:
             continue
         dt = parse_date(row[1])
         if not dt:
             continue
-        svc_raw = row[6].strip() if len(row) > 6 else ""
-        out_raw = row[11].strip() if len(row) > 11 else ""
+        # Pad short rows once and unpack by column instead of bounds-checking each cell
+        (_, _, _, _, _, _, svc_raw, problem, src, action,
+         team, out_raw, _, mkt, loc) = (row + pad)[:LEAD_COLS]
+        # Free-text columns repeat a handful of values; intern so leads share them
+        svc_raw = svc_raw.strip()
+        out_raw = out_raw.strip()
+        problem = sys.intern(problem.strip())
+        mkt = sys.intern(mkt.strip())
         booked = out_raw.lower() in ("booked", "boked") if out_raw else False
-        leads.append({
-            "date": dt,
-            "service": normalize_service(svc_raw) if svc_raw else None,
-            "service_raw": svc_raw,
-            "problem": row[7].strip() if len(row) > 7 and row[7].strip() else None,
-            "source": normalize_source(row[8]) if len(row) > 8 else "Unknown",
-            "action": get_action(row[9]) if len(row) > 9 else None,
-            "team_member": normalize_team_member(row[10]) if len(row) > 10 else None,
-            "outcome": normalize_outcome(out_raw) if out_raw else "Unknown",
-            "booked": booked,
-            "marketing": row[13].strip() if len(row) > 13 and row[13].strip() else None,
-            "location": normalize_location(row[14]) if len(row) > 14 else "Unknown",
-        })
+        ym, y = period_keys(dt.year, dt.month)
+        leads.append(Lead(
+            # Period keys are formatted once here rather than per aggregation loop
+            date=dt, ym=ym, y=y,
+            service=normalize_service(svc_raw) if svc_raw else None,
+            testing=is_testing_service(svc_raw),
+            problem=problem or None,
+            source=normalize_source(src),
+            action=get_action(action),
+            team_member=normalize_team_member(team),
+            outcome=normalize_outcome(out_raw) if out_raw else "Unknown",
+            booked=booked,
+            marketing=mkt or None,
+            location=normalize_location(loc),
+        ))
     return leads
 
 
@@ -416,57 +506,56 @@ def convert_db_rental():
     """Fetch rental entries from SQLite DB and convert to weekly + therapist format."""
     if not HAS_DB:
         return [], []
-    try:
-        db_rows = get_all_rental_entries()
-    except Exception as e:
-        logger.warning("Could not load DB rental entries: %s", e)
-        return [], []
-
     # Group by week
     week_map = defaultdict(lambda: {"total": 0, "cs": 0, "ftl": 0, "pl": 0, "mkt": 0, "testing": 0})
     therapist_totals = defaultdict(float)
 
     loc_map = {"FTL": "ftl", "CS": "cs", "PL": "pl"}
 
-    for row in db_rows:
-        ws = parse_date(row.get("week_start", ""))
-        we = parse_date(row.get("week_end", ""))
-        if not ws:
-            continue
-        if not we:
-            we = ws
-
-        amt = float(row.get("amount", 0))
-        if amt <= 0:
-            continue
-
-        loc = row.get("location", "FTL")
-        cat = row.get("category", "room_rental")
-        therapist = row.get("therapist", "")
-        week_key = ws.isoformat()
-
-        # Add to week totals
-        week_map[week_key]["total"] += amt
-        if cat == "marketing":
-            week_map[week_key]["mkt"] += amt
-            t_loc = "MKT"
-        elif cat == "testing":
-            week_map[week_key]["testing"] += amt
-            t_loc = "Testing"
-        else:
-            loc_key = loc_map.get(loc, "ftl")
-            week_map[week_key][loc_key] += amt
-            t_loc = loc
+    # Rows stream from the cursor, so query errors surface while iterating
+    try:
+        for row in get_all_rental_entries():
+            ws = parse_date(row["week_start"])
+            we = parse_date(row["week_end"])
+            if not ws:
+                continue
+            if not we:
+                we = ws
 
-        # Track per-therapist totals
-        if therapist:
-            therapist_totals[(therapist, therapist, t_loc)] += amt
+            amt = float(row["amount"])
+            if amt <= 0:
+                continue
 
-        # Store dates for later
-        if "start_date" not in week_map[week_key] or ws < week_map[week_key].get("_start_date", ws):
-            week_map[week_key]["_start_date"] = ws
-        if "end_date" not in week_map[week_key] or we > week_map[week_key].get("_end_date", we):
-            week_map[week_key]["_end_date"] = we
+            loc = row["location"]
+            cat = row["category"]
+            therapist = row["therapist"]
+            week_key = ws.isoformat()
+
+            # Add to week totals
+            week_map[week_key]["total"] += amt
+            if cat == "marketing":
+                week_map[week_key]["mkt"] += amt
+                t_loc = "MKT"
+            elif cat == "testing":
+                week_map[week_key]["testing"] += amt
+                t_loc = "Testing"
+            else:
+                loc_key = loc_map.get(loc, "ftl")
+                week_map[week_key][loc_key] += amt
+                t_loc = loc
+
+            # Track per-therapist totals
+            if therapist:
+                therapist_totals[(therapist, therapist, t_loc)] += amt
+
+            # Store dates for later
+            if "start_date" not in week_map[week_key] or ws < week_map[week_key].get("_start_date", ws):
+                week_map[week_key]["_start_date"] = ws
+            if "end_date" not in week_map[week_key] or we > week_map[week_key].get("_end_date", we):
+                week_map[week_key]["_end_date"] = we
+    except Exception as e:
+        logger.warning("Could not load DB rental entries: %s", e)
+        return [], []
 
     weekly = []
     for week_key, wdata in sorted(week_map.items()):
@@ -541,8 +630,18 @@ def process_rental(rows):
     weekly = []
     all_therapist_totals = defaultdict(float)
 
+    # Column positions are fixed by the header row; resolve them once, not per row
+    min_len = max(summary_cols.values(), default=0)
+    gt_i = summary_cols.get("gt", 98)
+    mkt_i = summary_cols.get("mkt", 99)
+    testing_i = summary_cols.get("testing", 100)
+    cs_i = summary_cols.get("cs", 101)
+    ftl_i = summary_cols.get("ftl", 102)
+    pl_i = summary_cols.get("pl", 103)
+    therapist_keys = [(tc["idx"], (tc["name"], tc["col"], tc["loc"])) for tc in therapist_cols]
+
     for row in rows[1:]:
-        if len(row) <= max(summary_cols.values(), default=0):
+        if len(row) <= min_len:
             continue
         start_date = parse_date(row[0])
         if not start_date:
@@ -550,37 +649,38 @@ def process_rental(rows):
         end_date = parse_date(row[1]) if len(row) > 1 else start_date
         if not end_date:
             end_date = start_date
-        gt = parse_dollar(row[summary_cols.get("gt", 98)])
+        gt = parse_dollar(row[gt_i])
         if gt == 0:
             continue
-        mkt = parse_dollar(row[summary_cols.get("mkt", 99)])
-        testing = parse_dollar(row[summary_cols.get("testing", 100)])
-        cs = parse_dollar(row[summary_cols.get("cs", 101)])
-        ftl = parse_dollar(row[summary_cols.get("ftl", 102)])
-        pl = parse_dollar(row[summary_cols.get("pl", 103)])
-
-        weekly.append({
+        mkt = parse_dollar(row[mkt_i])
+        testing = parse_dollar(row[testing_i])
+        cs = parse_dollar(row[cs_i])
+        ftl = parse_dollar(row[ftl_i])
+        pl = parse_dollar(row[pl_i])
+
+        week_vals = []
+        n = len(row)
+        for idx, key in therapist_keys:
+            if idx < n:
+                val = parse_dollar(row[idx])
+                if val > 0:
+                    all_therapist_totals[key] += val
+                    week_vals.append((key, val))
+        weekly.append(({
             "week": start_date.isoformat(),
             "total": int(gt), "cs": int(cs), "ftl": int(ftl), "pl": int(pl),
             "mkt": int(mkt), "testing": int(testing),
-            "start_date": start_date,
-            "end_date": end_date,
-        })
-        for tc in therapist_cols:
-            idx = tc["idx"]
-            if idx < len(row):
-                val = parse_dollar(row[idx])
-                if val > 0:
-                    all_therapist_totals[(tc["name"], tc["col"], tc["loc"])] += val
+        }, start_date, end_date, week_vals))
 
-    weekly.sort(key=lambda w: w["week"])
+    # (week, start_date, end_date, therapist amounts) — dates and per-therapist amounts ride
+    # alongside so the output dicts never need stripping and periods never re-parse rows
+    weekly.sort(key=lambda t: t[0]["week"])
 
     # Monthly & yearly
     mon_map = defaultdict(lambda: {"gt": 0, "cs": 0, "ftl": 0, "pl": 0, "mkt": 0, "testing": 0, "weeks": 0})
     yr_map = defaultdict(lambda: {"gt": 0, "cs": 0, "ftl": 0, "pl": 0, "mkt": 0, "testing": 0})
-    for w in weekly:
-        ed = w.get("end_date", w["start_date"])
-        m = ed.strftime("%Y-%m")
+    for w, _, ed, _ in weekly:
+        m = f"{ed.year:04d}-{ed.month:02d}"
         mon_map[m]["gt"] += w["total"]; mon_map[m]["cs"] += w["cs"]
         mon_map[m]["ftl"] += w["ftl"]; mon_map[m]["pl"] += w["pl"]
         mon_map[m]["mkt"] += w["mkt"]; mon_map[m]["testing"] += w["testing"]
@@ -598,68 +698,55 @@ def process_rental(rows):
     mkt_therapists_all = sorted([e for e in all_entries if e["loc"] == "MKT"], key=lambda x: -x["total"])
     test_therapists_all = sorted([e for e in all_entries if e["loc"] == "Testing"], key=lambda x: -x["total"])
 
-    weekly_clean = [{k: v for k, v in w.items() if k not in ("start_date", "end_date")} for w in weekly]
-    # Last 52 weeks for chart
+    weekly_clean = [t[0] for t in weekly]
+    # Last 52 weeks for chart — weekly is sorted, so that's a suffix of weekly_clean
     today = date.today()
     cutoff_52 = today - timedelta(weeks=52)
-    weekly_52 = [{k: v for k, v in w.items() if k not in ("start_date", "end_date")} for w in weekly if w["start_date"] >= cutoff_52]
+    weekly_52 = weekly_clean[bisect_left([t[1] for t in weekly], cutoff_52):]
 
     def period_summary(wdata):
-        gt = sum(w["total"] for w in wdata)
-        cs = sum(w["cs"] for w in wdata)
-        ftl = sum(w["ftl"] for w in wdata)
-        pl = sum(w["pl"] for w in wdata)
-        mkt = sum(w["mkt"] for w in wdata)
-        testing = sum(w["testing"] for w in wdata)
+        gt = sum(t[0]["total"] for t in wdata)
+        cs = sum(t[0]["cs"] for t in wdata)
+        ftl = sum(t[0]["ftl"] for t in wdata)
+        pl = sum(t[0]["pl"] for t in wdata)
+        mkt = sum(t[0]["mkt"] for t in wdata)
+        testing = sum(t[0]["testing"] for t in wdata)
         weeks = len(wdata)
-        return {"gt": int(gt), "cs": int(cs), "ftl": int(ftl), "pl": int(pl),
-                "mkt": int(mkt), "testing": int(testing), "weeks": weeks,
+        return {"gt": gt, "cs": cs, "ftl": ftl, "pl": pl,
+                "mkt": mkt, "testing": testing, "weeks": weeks,
                 "avgWeek": int(gt / weeks) if weeks else 0}
 
     def period_therapists(wdata, n=60, loc_filter=None):
-        dates = {w["start_date"] for w in wdata if "start_date" in w}
         totals = defaultdict(float)
-        for row in rows[1:]:
-            if len(row) <= max(summary_cols.values(), default=0):
-                continue
-            sd = parse_date(row[0])
-            if not sd or sd not in dates:
-                continue
-            gt = parse_dollar(row[summary_cols.get("gt", 98)])
-            if gt == 0:
-                continue
-            for tc in therapist_cols:
-                if loc_filter and tc["loc"] not in loc_filter:
+        for *_, week_vals in wdata:
+            for key, val in week_vals:
+                if loc_filter and key[2] not in loc_filter:
                     continue
-                if loc_filter is None and tc["loc"] in ("MKT", "Testing"):
+                if loc_filter is None and key[2] in ("MKT", "Testing"):
                     continue
-                idx = tc["idx"]
-                if idx < len(row):
-                    val = parse_dollar(row[idx])
-                    if val > 0:
-                        totals[(tc["name"], tc["col"], tc["loc"])] += val
+                totals[key] += val
         return sorted(
             [{"name": k[0], "col": k[1], "loc": k[2], "total": int(v)} for k, v in totals.items()],
             key=lambda x: -x["total"])[:n]
 
     today = date.today()
-    this_year = [w for w in weekly if w.get("end_date", w["start_date"]).year == today.year]
-    last_year = [w for w in weekly if w.get("end_date", w["start_date"]).year == today.year - 1]
-    this_month = [w for w in weekly if w.get("end_date", w["start_date"]).year == today.year and w.get("end_date", w["start_date"]).month == today.month]
+    this_year = [t for t in weekly if t[2].year == today.year]
+    last_year = [t for t in weekly if t[2].year == today.year - 1]
+    this_month = [t for t in weekly if t[2].year == today.year and t[2].month == today.month]
 
     week_start = today - timedelta(days=today.weekday())
     week_end = week_start + timedelta(days=6)
-    this_week = [w for w in weekly if w.get("start_date") and w.get("end_date") and w["start_date"] <= week_end and w["end_date"] >= week_start]
+    this_week = [t for t in weekly if t[1] <= week_end and t[2] >= week_start]
     last_week_start = week_start - timedelta(days=7)
     last_week_end = week_start - timedelta(days=1)
-    last_week = [w for w in weekly if w.get("start_date") and w.get("end_date") and w["start_date"] <= last_week_end and w["end_date"] >= last_week_start]
-    today_data = [w for w in weekly if w.get("start_date") and w.get("end_date") and w["start_date"] <= today <= w["end_date"]]
+    last_week = [t for t in weekly if t[1] <= last_week_end and t[2] >= last_week_start]
+    today_data = [t for t in weekly if t[1] <= today <= t[2]]
 
     lm = (date(today.year, today.month, 1) - timedelta(days=1))
-    last_month = [w for w in weekly if w.get("end_date", w["start_date"]).year == lm.year and w.get("end_date", w["start_date"]).month == lm.month]
+    last_month = [t for t in weekly if t[2].year == lm.year and t[2].month == lm.month]
     prev_ytd_end = date(today.year - 1, today.month, today.day)
-    prev_ytd = [w for w in weekly if w.get("end_date", w["start_date"]).year == today.year - 1 and w.get("end_date", w["start_date"]) <= prev_ytd_end]
-    prev_ly = [w for w in weekly if w.get("end_date", w["start_date"]).year == today.year - 2]
+    prev_ytd = [t for t in weekly if t[2].year == today.year - 1 and t[2] <= prev_ytd_end]
+    prev_ly = [t for t in weekly if t[2].year == today.year - 2]
 
     return {
         "weekly": weekly_clean, "weekly52": weekly_52, "monthly": rental_monthly, "yearly": rental_yearly,
@@ -703,36 +790,58 @@ def process_rental(rows):
 def build_monthly_revenue(leads):
     mon = defaultdict(lambda: {"therapyBooked": 0, "testingBooked": 0})
     for l in leads:
-        if not l["booked"]:
+        if not l.booked:
             continue
-        m = l["date"].strftime("%Y-%m")
-        if is_testing_service(l.get("service_raw", "")):
+        m = l.ym
+        if l.testing:
             mon[m]["testingBooked"] += 1
         else:
             mon[m]["therapyBooked"] += 1
     return [{"month": k, **v} for k, v in sorted(mon.items())]
 
 
+def _lead_date(l):
+    return l.date
+
+
 def build_cashflow(leads, rental_weekly):
+    # leads must be sorted by date, so each window is a bisected slice
     today = date.today()
-    recent = [l for l in leads if l["date"] >= today - timedelta(days=90)]
+    recent = leads[bisect_left(leads, today - timedelta(days=90), key=_lead_date):]
     weeks_span = max(1, 90 / 7)
-    therapy_pw = round(sum(1 for l in recent if l["booked"] and not is_testing_service(l.get("service_raw", ""))) / weeks_span, 1)
-    testing_pw = round(sum(1 for l in recent if l["booked"] and is_testing_service(l.get("service_raw", ""))) / weeks_span, 1)
+    # One pass over the window's booked leads; the flag splits them by kind
+    booked_testing = [l.testing for l in recent if l.booked]
+    testing_n = sum(booked_testing)
+    therapy_pw = round((len(booked_testing) - testing_n) / weeks_span, 1)
+    testing_pw = round(testing_n / weeks_span, 1)
 
     today_week_start = today - timedelta(days=today.weekday())
     start_cf = today - timedelta(weeks=14)
     start_cf_monday = start_cf - timedelta(days=start_cf.weekday())
 
+    # Bucket booked leads into the 30 chart weeks in one pass, indexed by days since start // 7
+    start_ord = start_cf_monday.toordinal()
+    therapy_cnt = [0] * 30
+    testing_cnt = [0] * 30
+    lo = bisect_left(leads, start_cf_monday, key=_lead_date)
+    hi = bisect_left(leads, start_cf_monday + timedelta(weeks=30), key=_lead_date)
+    for l in leads[lo:hi]:
+        if not l.booked:
+            continue
+        wk = (l.date.toordinal() - start_ord) // 7
+        if l.testing:
+            testing_cnt[wk] += 1
+        else:
+            therapy_cnt[wk] += 1
+
     cf_weekly = []
     for i in range(30):
         ws = start_cf_monday + timedelta(weeks=i)
         we = ws + timedelta(days=6)
         is_past = we < today
 
-        wl = [l for l in leads if ws <= l["date"] <= we]
-        tn = sum(1 for l in wl if l["booked"] and not is_testing_service(l.get("service_raw", "")))
-        xn = sum(1 for l in wl if l["booked"] and is_testing_service(l.get("service_raw", "")))
+        tn = therapy_cnt[i]
+        xn = testing_cnt[i]
 
         if is_past or ws <= today <= we:
             proj = False
@@ -740,35 +849,30 @@ def build_cashflow(leads, rental_weekly):
             tn, xn = round(therapy_pw), round(testing_pw)
             proj = True
 
-        lt, mt, ht = int(tn * ROOM_RENTAL * 1), int(tn * ROOM_RENTAL * 2), int(tn * ROOM_RENTAL * 4)
-        lx = mx = hx = int(xn * TESTING_REV)
-
-        cf_weekly.append({
-            "week": ws.isoformat(), "isPast": is_past,
-            "lowT": lt, "lowX": lx, "low": lt + lx, "lowNc": tn, "lowNx": xn,
-            "medT": mt, "medX": mx, "med": mt + mx, "medNc": tn, "medNx": xn,
-            "highT": ht, "highX": hx, "high": ht + hx, "highNc": tn, "highNx": xn,
-            "proj": proj,
-        })
+        # Per-scenario revenue is tn/xn times the multipliers emitted once below
+        cf_weekly.append({"week": ws, "isPast": is_past, "tn": tn, "xn": xn, "proj": proj})
 
     mon_map = defaultdict(lambda: {"isPast": True, "lowT": 0, "lowX": 0, "low": 0,
                                      "medT": 0, "medX": 0, "med": 0,
                                      "highT": 0, "highX": 0, "high": 0})
     for w in cf_weekly:
-        wd = parse_date(w["week"])
-        if not wd:
-            continue
-        m = wd.strftime("%Y-%m")
-        for k in ("lowT", "lowX", "low", "medT", "medX", "med", "highT", "highX", "high"):
-            mon_map[m][k] += w[k]
+        wd = w["week"]
+        mm = mon_map[f"{wd.year:04d}-{wd.month:02d}"]
+        room = w["tn"] * ROOM_RENTAL
+        test = w["xn"] * TESTING_REV
+        for k, mult in CASHFLOW_SCENARIOS.items():
+            mm[k + "T"] += room * mult
+            mm[k + "X"] += test
+            mm[k] += room * mult + test
         if w["proj"]:
-            mon_map[m]["isPast"] = False
+            mm["isPast"] = False
 
     return {
         "weekly": cf_weekly,
         "monthly": [{"month": k, **v} for k, v in sorted(mon_map.items())],
+        "multipliers": {**CASHFLOW_SCENARIOS, "room": ROOM_RENTAL, "test": TESTING_REV},
         "rates": {"therapyPerWeek": therapy_pw, "testingPerWeek": testing_pw},
-        "todayWeek": today_week_start.isoformat(),
+        "todayWeek": today_week_start,
     }
 
 
@@ -784,14 +888,14 @@ def merge_rental_data(rental, db_weekly, db_therapists):
     """
     from datetime import date, timedelta
 
-    # Rebuild full weekly list with start_date/end_date for period filtering
+    # Rebuild full weekly list as (week, start_date, end_date) for period filtering
     gs_weekly = []
     for w in rental.get("weekly", []):
         sd = parse_date(w["week"])
-        gs_weekly.append({**w, "start_date": sd, "end_date": sd + timedelta(days=6) if sd else sd})
+        gs_weekly.append((dict(w), sd, sd + timedelta(days=6) if sd else sd))
 
     # Merge: combine DB weeks into GS weeks
-    week_index = {w["week"]: w for w in gs_weekly}
+    week_index = {t[0]["week"]: t[0] for t in gs_weekly}
     for dbw in db_weekly:
         wk = dbw["week"]
         if wk in week_index:
@@ -805,10 +909,11 @@ def merge_rental_data(rental, db_weekly, db_therapists):
             existing["testing"] = existing.get("testing", 0) + dbw["testing"]
         else:
             # New week only in DB
-            gs_weekly.append(dbw)
-            week_index[wk] = dbw
+            w = {k: v for k, v in dbw.items() if k not in ("start_date", "end_date")}
+            gs_weekly.append((w, dbw["start_date"], dbw["end_date"]))
+            week_index[wk] = w
 
-    gs_weekly.sort(key=lambda w: w["week"])
+    gs_weekly.sort(key=lambda t: t[0]["week"])
 
     # Merge therapist totals
     gs_therapists = {(t["name"], t["loc"]): t for t in rental.get("therapists", [])}
@@ -833,14 +938,15 @@ def merge_rental_data(rental, db_weekly, db_therapists):
     mkt_all = sorted(list(gs_mkt.values()), key=lambda x: -x["total"])
     test_all = sorted(list(gs_test.values()), key=lambda x: -x["total"])
 
-    # Recompute monthly & yearly from merged weekly
+    # Recompute monthly & yearly from merged weekly — gs_weekly is sorted, so keys are
+    # inserted in ascending order and the maps need no sorting on the way out
     mon_map = defaultdict(lambda: {"gt": 0, "cs": 0, "ftl": 0, "pl": 0, "mkt": 0, "testing": 0, "weeks": 0})
     yr_map = defaultdict(lambda: {"gt": 0, "cs": 0, "ftl": 0, "pl": 0, "mkt": 0, "testing": 0})
-    for w in gs_weekly:
-        ed = w.get("end_date") or w.get("start_date")
+    for w, sd, ed in gs_weekly:
+        ed = ed or sd
         if not ed:
             continue
-        m = ed.strftime("%Y-%m")
+        m = f"{ed.year:04d}-{ed.month:02d}"
         mon_map[m]["gt"] += w.get("total", 0)
         mon_map[m]["cs"] += w.get("cs", 0)
         mon_map[m]["ftl"] += w.get("ftl", 0)
@@ -856,16 +962,15 @@ def merge_rental_data(rental, db_weekly, db_therapists):
         yr_map[y]["mkt"] += w.get("mkt", 0)
         yr_map[y]["testing"] += w.get("testing", 0)
 
-    rental_monthly = [{"month": k, **{kk: int(vv) for kk, vv in v.items()}} for k, v in sorted(mon_map.items())]
-    rental_yearly = [{"year": k, **{kk: int(vv) for kk, vv in v.items()}} for k, v in sorted(yr_map.items())]
+    # Weekly amounts are already ints (both sources truncate on load), so the sums are too
+    rental_monthly = [{"month": k, **v} for k, v in mon_map.items()]
+    rental_yearly = [{"year": k, **v} for k, v in yr_map.items()]
 
-    # Clean weekly for output (remove internal date objects)
-    weekly_clean = [{k: v for k, v in w.items() if k not in ("start_date", "end_date")} for w in gs_weekly]
+    weekly_clean = [t[0] for t in gs_weekly]
 
     today = date.today()
     cutoff_52 = today - timedelta(weeks=52)
-    weekly_52 = [{k: v for k, v in w.items() if k not in ("start_date", "end_date")}
-                 for w in gs_weekly if w.get("start_date") and w["start_date"] >= cutoff_52]
+    weekly_52 = weekly_clean[bisect_left([t[1] or date.min for t in gs_weekly], cutoff_52):]
 
     # Period summary helper
     def period_summary(wdata):
@@ -876,8 +981,8 @@ def merge_rental_data(rental, db_weekly, db_therapists):
         mkt = sum(w.get("mkt", 0) for w in wdata)
         testing = sum(w.get("testing", 0) for w in wdata)
         weeks = len(wdata)
-        return {"gt": int(gt), "cs": int(cs), "ftl": int(ftl), "pl": int(pl),
-                "mkt": int(mkt), "testing": int(testing), "weeks": weeks,
+        return {"gt": gt, "cs": cs, "ftl": ftl, "pl": pl,
+                "mkt": mkt, "testing": testing, "weeks": weeks,
                 "avgWeek": int(gt / weeks) if weeks else 0}
 
     # Period therapist helper — uses DB therapist data filtered by date range
@@ -889,21 +994,41 @@ def merge_rental_data(rental, db_weekly, db_therapists):
             return sorted([t for t in all_therapists if t["loc"] in loc_filter], key=lambda x: -x["total"])[:n]
         return sorted([t for t in all_therapists if t["loc"] not in ("MKT", "Testing")], key=lambda x: -x["total"])[:n]
 
-    this_year = [w for w in gs_weekly if w.get("end_date") and w["end_date"].year == today.year]
-    last_year = [w for w in gs_weekly if w.get("end_date") and w["end_date"].year == today.year - 1]
-    this_month = [w for w in gs_weekly if w.get("end_date") and w["end_date"].year == today.year and w["end_date"].month == today.month]
     week_start = today - timedelta(days=today.weekday())
     week_end = week_start + timedelta(days=6)
-    this_week = [w for w in gs_weekly if w.get("start_date") and w.get("end_date") and w["start_date"] <= week_end and w["end_date"] >= week_start]
     last_week_start = week_start - timedelta(days=7)
     last_week_end = week_start - timedelta(days=1)
-    last_week = [w for w in gs_weekly if w.get("start_date") and w.get("end_date") and w["start_date"] <= last_week_end and w["end_date"] >= last_week_start]
-    today_data = [w for w in gs_weekly if w.get("start_date") and w.get("end_date") and w["start_date"] <= today <= w["end_date"]]
     lm = (date(today.year, today.month, 1) - timedelta(days=1))
-    last_month = [w for w in gs_weekly if w.get("end_date") and w["end_date"].year == lm.year and w["end_date"].month == lm.month]
     prev_ytd_end = date(today.year - 1, today.month, today.day)
-    prev_ytd = [w for w in gs_weekly if w.get("end_date") and w["end_date"].year == today.year - 1 and w["end_date"] <= prev_ytd_end]
-    prev_ly = [w for w in gs_weekly if w.get("end_date") and w["end_date"].year == today.year - 2]
+
+    # Sort every week into its period buckets in a single pass
+    buckets = {"ty": [], "ly": [], "tm": [], "tw": [], "lw": [], "td": [], "lm": [], "pytd": [], "ply": []}
+    for w, sd, ed in gs_weekly:
+        if not ed:
+            continue
+        if ed.year == today.year:
+            buckets["ty"].append(w)
+            if ed.month == today.month:
+                buckets["tm"].append(w)
+        elif ed.year == today.year - 1:
+            buckets["ly"].append(w)
+            if ed <= prev_ytd_end:
+                buckets["pytd"].append(w)
+        elif ed.year == today.year - 2:
+            buckets["ply"].append(w)
+        if ed.year == lm.year and ed.month == lm.month:
+            buckets["lm"].append(w)
+        if sd:
+            if sd <= week_end and ed >= week_start:
+                buckets["tw"].append(w)
+            if sd <= last_week_end and ed >= last_week_start:
+                buckets["lw"].append(w)
+            if sd <= today <= ed:
+                buckets["td"].append(w)
+
+    this_year, last_year, this_month = buckets["ty"], buckets["ly"], buckets["tm"]
+    this_week, last_week, today_data = buckets["tw"], buckets["lw"], buckets["td"]
+    last_month, prev_ytd, prev_ly = buckets["lm"], buckets["pytd"], buckets["ply"]
 
     # Build per-period therapist lists from DB + GS combined data
     # We need to rebuild these from the per-week DB entries
@@ -955,7 +1080,7 @@ def merge_rental_data(rental, db_weekly, db_therapists):
         "therapists": therapists_all,
         "mktTherapists": mkt_all,
         "testTherapists": test_all,
-        "allTime": period_summary(gs_weekly),
+        "allTime": period_summary(weekly_clean),
         "ytd": period_summary(this_year),
         "lastYear": period_summary(last_year),
         "thisMonth": period_summary(this_month),
@@ -1019,35 +1144,53 @@ def generate_data() -> dict:
         prev_prev_mo_start = date(prev_month_start.year - 1, 12, 1)
     prev_prev_mo_end = prev_month_start - timedelta(days=1)
 
-    # Fetch
-    lead_rows = fetch_csv(LEAD_CSV_URL)
-    rental_rows = fetch_csv(RENTAL_CSV_URL)
+    # Fetch — both sheets and the custom DB are independent sources, so load them
+    # concurrently; each sheet is parsed on its worker as soon as its body arrives
+    # so one sheet's processing overlaps the other's download
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        f_lead = ex.submit(lambda: process_leads(fetch_csv(LEAD_CSV_URL)))
+        f_rental = ex.submit(lambda: process_rental(fetch_csv(RENTAL_CSV_URL)))
+        f_db_leads = ex.submit(convert_db_leads)
+        f_db_rental = ex.submit(convert_db_rental)
+        all_leads = f_lead.result()
+        rental = f_rental.result()
+        db_leads = f_db_leads.result()
+        db_rental_weekly, db_rental_therapists = f_db_rental.result()
 
-    all_leads = process_leads(lead_rows)
     logger.info("Processed %d leads from Google Sheets", len(all_leads))
 
     # Merge in custom DB leads
-    db_leads = convert_db_leads()
     if db_leads:
         # Deduplicate: skip DB leads whose (date, first_name+last_name combo) might already exist
         # For now, simply append — DB leads use the intake form and won't duplicate CSV entries
         all_leads.extend(db_leads)
         logger.info("Total leads after DB merge: %d", len(all_leads))
 
-    # Slice by period
-    ytd       = [l for l in all_leads if year_start <= l["date"] <= today]
-    lastyear  = [l for l in all_leads if ly_start <= l["date"] <= ly_end]
-    month     = [l for l in all_leads if l["date"] >= month_start]
-    week      = [l for l in all_leads if l["date"] >= week_start]
-    tod       = [l for l in all_leads if l["date"] == today]
-
-    prev_ytd  = [l for l in all_leads if prev_ytd_start <= l["date"] <= prev_ytd_end]
-    prev_ly   = [l for l in all_leads if prev_ly_start <= l["date"] <= prev_ly_end]
-    prev_mo   = [l for l in all_leads if prev_month_start <= l["date"] <= prev_month_end]
-    prev_wk   = [l for l in all_leads if prev_week_start <= l["date"] <= prev_week_end]
-    prev_prev_wk = [l for l in all_leads if prev_prev_wk_start <= l["date"] <= prev_prev_wk_end]
-    prev_prev_mo = [l for l in all_leads if prev_prev_mo_start <= l["date"] <= prev_prev_mo_end]
-    yest      = [l for l in all_leads if l["date"] == yesterday]
+    # Slice by period — one pass over the leads; periods overlap, so a lead may land in several
+    ytd, lastyear, month, week, tod = [], [], [], [], []
+    prev_ytd, prev_ly, prev_mo, prev_wk, prev_prev_wk, prev_prev_mo, yest = [], [], [], [], [], [], []
+    four_wk_leads = []
+    four_wk_start = week_start - timedelta(days=28)
+    period_bounds = (
+        (year_start, today, ytd),
+        (ly_start, ly_end, lastyear),
+        (month_start, date.max, month),
+        (week_start, date.max, week),
+        (today, today, tod),
+        (prev_ytd_start, prev_ytd_end, prev_ytd),
+        (prev_ly_start, prev_ly_end, prev_ly),
+        (prev_month_start, prev_month_end, prev_mo),
+        (prev_week_start, prev_week_end, prev_wk),
+        (prev_prev_wk_start, prev_prev_wk_end, prev_prev_wk),
+        (prev_prev_mo_start, prev_prev_mo_end, prev_prev_mo),
+        (yesterday, yesterday, yest),
+        (four_wk_start, week_start - timedelta(days=1), four_wk_leads),
+    )
+    for l in all_leads:
+        d = l.date
+        for lo, hi, bucket in period_bounds:
+            if lo <= d <= hi:
+                bucket.append(l)
 
     data = {
         "all":       build_period(all_leads),
@@ -1061,28 +1204,27 @@ def generate_data() -> dict:
         "_monthlyRevenue": build_monthly_revenue(all_leads),
     }
 
-    rental = process_rental(rental_rows)
-
     # ── Merge DB rental entries into Google Sheet rental data ──
-    db_rental_weekly, db_rental_therapists = convert_db_rental()
     if db_rental_weekly:
         rental = merge_rental_data(rental, db_rental_weekly, db_rental_therapists)
         logger.info("Merged DB rental data into dashboard")
 
     data["_rental"] = rental
-    data["_cashflow"] = build_cashflow(all_leads, rental.get("weekly", []))
-    data["_generated"] = datetime.now().isoformat()
+    # Date-ordered view for the windowed lookups; sheet rows are already near date
+    # order so this is close to linear. all_leads keeps entry order, which decides
+    # tie order in the period breakdowns.
+    leads_by_date = sorted(all_leads, key=_lead_date)
+    data["_cashflow"] = build_cashflow(leads_by_date, rental.get("weekly", []))
+    data["_generated"] = datetime.now()
 
     # ── Day-of-week 4-week average ──
-    four_wk_start = week_start - timedelta(days=28)
-    four_wk_leads = [l for l in all_leads if four_wk_start <= l["date"] < week_start]
     dow_names = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
     dow_leads = defaultdict(int)
     dow_booked = defaultdict(int)
     for l in four_wk_leads:
-        d = l["date"].weekday()
+        d = l.date.weekday()
         dow_leads[d] += 1
-        if l["booked"]:
+        if l.booked:
             dow_booked[d] += 1
     dow_avg = []
     for i, name in enumerate(dow_names):
@@ -1092,5 +1234,7 @@ def generate_data() -> dict:
     dow_avg.sort(key=lambda x: x["leads"], reverse=True)
     data["_dayOfWeekAvg"] = dow_avg
 
-    logger.info("Data generation complete — %d bytes JSON", len(json.dumps(data)))
+    # Counts are free; the caller logs the byte size once it has serialized the payload
+    logger.info("Data generation complete — %d leads, %d rental weeks",
+                len(all_leads), len(rental.get("weekly", [])))
     return data
@@ -5,39 +5,157 @@ Stores leads submitted via the custom intake form.
 
 import sqlite3
 import os
+import atexit
 import logging
+import queue
+import threading
 from datetime import datetime, timedelta
 from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
 
 logger = logging.getLogger(__name__)
 
 DB_PATH = os.environ.get("DB_PATH", "/data/bayview.db")
+READ_POOL_SIZE = 4
+STATEMENT_CACHE_SIZE = 256
+DELETE_BATCH_SIZE = 500  # ids bound per DELETE; under SQLite's 999 host-parameter limit on older builds
+MMAP_SIZE = 256 * 1024 * 1024  # well above leads + rental_entries; reads become page-cache hits
+
+
+_dir_ready = False
 
 
 def _ensure_dir():
+    # DB_PATH is fixed for the process, so the directory only needs checking once
+    global _dir_ready
+    if _dir_ready:
+        return
     d = os.path.dirname(DB_PATH)
     if d and not os.path.exists(d):
         os.makedirs(d, exist_ok=True)
+    _dir_ready = True
+
+
+# Connections are opened once and reused: one writer serialized by a lock, plus a
+# small pool of readers that WAL lets run alongside it
+_write_conn = None
+_write_lock = threading.Lock()
+_read_pool = queue.LifoQueue(maxsize=READ_POOL_SIZE)
+
+
+def _dict_row(cursor, row):
+    # Rows come back as plain dicts straight from the cursor, with no
+    # intermediate sqlite3.Row to copy out of
+    return dict(zip([col[0] for col in cursor.description], row))
+
+
+def _connect(readonly=False):
+    _ensure_dir()
+    # Readers open the file read-only so they can never contend for the write lock
+    target = Path(DB_PATH).resolve().as_uri() + "?mode=ro" if readonly else DB_PATH
+    # Long-lived connections keep their prepared statements; size the cache to
+    # hold every distinct query in this module
+    conn = sqlite3.connect(target, uri=readonly, check_same_thread=False,
+                           cached_statements=STATEMENT_CACHE_SIZE)
+    conn.row_factory = _dict_row
+    # Set once per connection now that connections are long-lived. NORMAL is
+    # durable across app crashes under WAL; only a power loss can drop the
+    # last commits.
+    conn.executescript(f"""
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=NORMAL;
+        PRAGMA busy_timeout=5000;
+        PRAGMA cache_size=-20000;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA mmap_size={MMAP_SIZE};
+        PRAGMA wal_autocheckpoint=10000;
+        PRAGMA journal_size_limit=67108864;
+    """)
+    return conn
 
 
 @contextmanager
 def get_db():
-    _ensure_dir()
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
+    """Writer connection; commits on success, rolls back on error."""
+    global _write_conn
+    with _write_lock:
+        if _write_conn is None:
+            _write_conn = _connect()
+        conn = _write_conn
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+@contextmanager
+def get_read_db():
+    """Borrow a reader connection from the pool for SELECTs."""
+    try:
+        conn = _read_pool.get_nowait()
+    except queue.Empty:
+        conn = _connect(readonly=True)
     try:
         yield conn
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
     finally:
-        conn.close()
+        try:
+            _read_pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+@atexit.register
+def _close_connections():
+    global _write_conn
+    while True:
+        try:
+            _read_pool.get_nowait().close()
+        except queue.Empty:
+            break
+    with _write_lock:
+        if _write_conn is not None:
+            # Checkpoints are spread out (wal_autocheckpoint above), so fold the WAL
+            # back in on the way out and leave fresh planner stats for next start
+            try:
+                _write_conn.execute("PRAGMA optimize")
+                _write_conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except sqlite3.Error as e:
+                logger.warning("SQLite shutdown maintenance failed: %s", e)
+            _write_conn.close()
+            _write_conn = None
+
+
+# Row timestamps are taken by SQLite at write time, in the same local ISO-8601
+# form datetime.now().isoformat() produced (to the millisecond)
+_NOW_SQL = "strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')"
+
+
+def _add_column(conn, table, name, decl):
+    """Add a column to an existing table unless it is already there."""
+    cols = {r["name"] for r in conn.execute(f"PRAGMA table_xinfo({table})")}
+    if name not in cols:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+
+
+def _drop_column(conn, table, name):
+    """Drop a column from an existing table if it is still there."""
+    cols = {r["name"] for r in conn.execute(f"PRAGMA table_xinfo({table})")}
+    if name in cols:
+        conn.execute(f"ALTER TABLE {table} DROP COLUMN {name}")
+
+
+@lru_cache(maxsize=None)
+def _update_sql(table, keys):
+    """UPDATE statement for one set of edited columns, built once per shape."""
+    sets = "".join(f"{key} = ?, " for key in keys)
+    return f"UPDATE {table} SET {sets}updated_at = {_NOW_SQL} WHERE id = ?"
 
 
 def init_db():
-    _ensure_dir()
     with get_db() as conn:
         conn.execute("""
             CREATE TABLE IF NOT EXISTS leads (
@@ -60,18 +178,36 @@ def init_db():
                 updated_at TEXT NOT NULL
             )
         """)
+        # Serves the date-ordered listings without a sort
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_leads_date_created
+            ON leads(date DESC, created_at DESC)
+        """)
+        # Pending status folded into one indexed column, so get_pending_leads is a
+        # single range scan rather than an OR across three columns
+        _add_column(conn, "leads", "is_pending", """INTEGER GENERATED ALWAYS AS (
+            referred_to = 'Pending' OR action_taken = 'Pending'
+            OR referral_outcome IN ('Called', 'Emailed', 'Left Message', 'Pending')) VIRTUAL""")
+        # Same order as the listing, so the range and the ORDER BY come off one index
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_leads_pending_date_created
+            ON leads(is_pending, date DESC, created_at DESC)
+        """)
+        # Superseded pending indexes and the epoch-seconds date column they used
+        for index in ("idx_leads_pending", "idx_leads_pending_date", "idx_leads_date_int"):
+            conn.execute(f"DROP INDEX IF EXISTS {index}")
+        _drop_column(conn, "leads", "date_int")
         logger.info("Database initialized at %s", DB_PATH)
 
 
 def add_lead(data):
-    now = datetime.now().isoformat()
     with get_db() as conn:
-        cur = conn.execute("""
+        cur = conn.execute(f"""
             INSERT INTO leads (date, location, first_name, last_name, phone, email,
                 service_type, presenting_problem, referral_source, action_taken,
                 referred_to, marketing_program, referral_outcome, notes,
                 created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, {_NOW_SQL}, {_NOW_SQL})
         """, (
             data.get("date", ""),
             data.get("location", ""),
@@ -87,91 +223,133 @@ def add_lead(data):
             data.get("marketing_program", "No"),
             data.get("referral_outcome", ""),
             data.get("notes", ""),
-            now, now
         ))
-        return cur.lastrowid
+    _invalidate_dashboard_leads()
+    return cur.lastrowid
+
+
+_ALLOWED_LEAD = frozenset({
+    "referred_to", "referral_outcome", "action_taken",
+    "marketing_program", "notes", "location", "service_type",
+    "presenting_problem", "referral_source", "phone", "email"})
 
 
 def update_lead(lead_id, data):
-    now = datetime.now().isoformat()
-    fields = []
-    values = []
-    allowed = ["referred_to", "referral_outcome", "action_taken",
-               "marketing_program", "notes", "location", "service_type",
-               "presenting_problem", "referral_source", "phone", "email"]
-    for key in allowed:
-        if key in data:
-            fields.append(f"{key} = ?")
-            values.append(data[key])
-    if not fields:
+    # Sorted so each set of edited columns maps to one cached UPDATE statement
+    keys = tuple(sorted(_ALLOWED_LEAD & data.keys()))
+    if not keys:
         return False
-    fields.append("updated_at = ?")
-    values.append(now)
+    values = [data[key] for key in keys]
     values.append(lead_id)
     with get_db() as conn:
-        conn.execute(f"UPDATE leads SET {', '.join(fields)} WHERE id = ?", values)
+        conn.execute(_update_sql("leads", keys), values)
+    _invalidate_dashboard_leads()
     return True
 
 
 def get_pending_leads(days=14):
     cutoff = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
-    with get_db() as conn:
+    with get_read_db() as conn:
         rows = conn.execute("""
             SELECT * FROM leads
-            WHERE (referred_to = 'Pending' OR action_taken = 'Pending' OR referral_outcome IN ('Called', 'Emailed', 'Left Message', 'Pending'))
-              AND date >= ?
+            WHERE is_pending = 1 AND date >= ?
             ORDER BY date DESC, created_at DESC
         """, (cutoff,)).fetchall()
-    return [dict(r) for r in rows]
+    return rows
 
 
 def get_recent_leads(days=30):
     """Return all leads from the last N days."""
+    # Filter on date itself (ISO text sorts correctly) so idx_leads_date_created
+    # serves both the range and the ORDER BY
     cutoff = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
-    with get_db() as conn:
+    with get_read_db() as conn:
         rows = conn.execute("""
             SELECT * FROM leads
             WHERE date >= ?
             ORDER BY date DESC, created_at DESC
         """, (cutoff,)).fetchall()
-    return [dict(r) for r in rows]
+    return rows
 
 
 def get_all_leads():
-    with get_db() as conn:
-        rows = conn.execute("SELECT * FROM leads ORDER BY date DESC, created_at DESC").fetchall()
-    return [dict(r) for r in rows]
+    """Yield every lead, newest first, one row at a time."""
+    with get_read_db() as conn:
+        yield from conn.execute("SELECT * FROM leads ORDER BY date DESC, created_at DESC")
 
 
 def get_lead(lead_id):
-    with get_db() as conn:
-        row = conn.execute("SELECT * FROM leads WHERE id = ?", (lead_id,)).fetchone()
-    return dict(row) if row else None
+    with get_read_db() as conn:
+        return conn.execute("SELECT * FROM leads WHERE id = ?", (lead_id,)).fetchone()
 
 
 def delete_lead(lead_id):
     with get_db() as conn:
         conn.execute("DELETE FROM leads WHERE id = ?", (lead_id,))
+    _invalidate_dashboard_leads()
     return True
 
 
-def get_leads_for_dashboard():
-    """Return leads in a format compatible with the Google Sheet CSV structure."""
+def delete_leads(lead_ids):
+    """Delete several leads in one transaction. Returns the count removed."""
+    lead_ids = list(lead_ids)
+    if not lead_ids:
+        return 0
+    deleted = 0
     with get_db() as conn:
-        rows = conn.execute("""
-            SELECT date, first_name, last_name, phone, email, service_type,
-                   presenting_problem, referral_source, action_taken, referred_to,
-                   referral_outcome, notes, marketing_program, location, created_at
-            FROM leads ORDER BY date ASC
-        """).fetchall()
-    return [dict(r) for r in rows]
+        for i in range(0, len(lead_ids), DELETE_BATCH_SIZE):
+            batch = lead_ids[i:i + DELETE_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            cur = conn.execute(f"DELETE FROM leads WHERE id IN ({placeholders})", batch)
+            deleted += cur.rowcount
+    _invalidate_dashboard_leads()
+    return deleted
+
+
+# Dashboard lead rows change only through the functions above, so they are kept
+# in memory between refreshes. The generation counter stops a read that raced a
+# write from caching the pre-write rows. Every caller gets the same row objects,
+# so they are cached as read-only mappings.
+_dashboard_lock = threading.Lock()
+_dashboard_cache = {"gen": 0, "rows": None}
+
+
+def _invalidate_dashboard_leads():
+    with _dashboard_lock:
+        _dashboard_cache["gen"] += 1
+        _dashboard_cache["rows"] = None
+
+
+def get_leads_for_dashboard():
+    """Yield leads in a format compatible with the Google Sheet CSV structure."""
+    with _dashboard_lock:
+        gen, rows = _dashboard_cache["gen"], _dashboard_cache["rows"]
+    if rows is None:
+        with get_read_db() as conn:
+            rows = tuple(map(MappingProxyType, conn.execute("""
+                SELECT date, first_name, last_name, phone, email, service_type,
+                       presenting_problem, referral_source, action_taken, referred_to,
+                       referral_outcome, notes, marketing_program, location, created_at
+                FROM leads ORDER BY date ASC
+            """)))
+        with _dashboard_lock:
+            if _dashboard_cache["gen"] == gen:
+                _dashboard_cache["rows"] = rows
+    yield from rows
 
 
 
 # ── Room Rental Entries ─────────────────────────────────────────────────────
 
+# Shared by the single and bulk insert paths so both hit one cached statement
+_INSERT_RENTAL_SQL = f"""
+    INSERT INTO rental_entries
+    (week_start, week_end, therapist, location, amount, category, notes, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, {_NOW_SQL}, {_NOW_SQL})
+"""
+
+
 def init_rental_db():
-    _ensure_dir()
     with get_db() as conn:
         conn.execute("""
             CREATE TABLE IF NOT EXISTS rental_entries (
@@ -196,13 +374,8 @@ def init_rental_db():
 
 
 def add_rental_entry(data):
-    now = datetime.now().isoformat()
     with get_db() as conn:
-        cur = conn.execute("""
-            INSERT INTO rental_entries
-            (week_start, week_end, therapist, location, amount, category, notes, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        cur = conn.execute(_INSERT_RENTAL_SQL, (
             data.get("week_start", ""),
             data.get("week_end", ""),
             data.get("therapist", ""),
@@ -210,52 +383,42 @@ def add_rental_entry(data):
             float(data.get("amount", 0)),
             data.get("category", "room_rental"),
             data.get("notes", ""),
-            now, now
         ))
         return cur.lastrowid
 
 
 def add_rental_entries_bulk(entries):
     """Insert multiple rental entries at once (for a whole week)."""
-    now = datetime.now().isoformat()
-    ids = []
+    if not entries:
+        return []
+    rows = [(
+        data.get("week_start", ""),
+        data.get("week_end", ""),
+        data.get("therapist", ""),
+        data.get("location", ""),
+        float(data.get("amount", 0)),
+        data.get("category", "room_rental"),
+        data.get("notes", ""),
+    ) for data in entries]
     with get_db() as conn:
-        for data in entries:
-            cur = conn.execute("""
-                INSERT INTO rental_entries
-                (week_start, week_end, therapist, location, amount, category, notes, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                data.get("week_start", ""),
-                data.get("week_end", ""),
-                data.get("therapist", ""),
-                data.get("location", ""),
-                float(data.get("amount", 0)),
-                data.get("category", "room_rental"),
-                data.get("notes", ""),
-                now, now
-            ))
-            ids.append(cur.lastrowid)
-    return ids
+        # Take the write lock up front; holding it makes the new rowids contiguous
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(_INSERT_RENTAL_SQL, rows)
+        last = conn.execute("SELECT last_insert_rowid() AS id").fetchone()["id"]
+    return list(range(last - len(rows) + 1, last + 1))
+
+
+_ALLOWED_RENTAL = frozenset({"therapist", "location", "amount", "category", "notes", "week_start", "week_end"})
 
 
 def update_rental_entry(entry_id, data):
-    now = datetime.now().isoformat()
-    fields = []
-    values = []
-    allowed = ["therapist", "location", "amount", "category", "notes", "week_start", "week_end"]
-    for key in allowed:
-        if key in data:
-            val = float(data[key]) if key == "amount" else data[key]
-            fields.append(f"{key} = ?")
-            values.append(val)
-    if not fields:
+    keys = tuple(sorted(_ALLOWED_RENTAL & data.keys()))
+    if not keys:
         return False
-    fields.append("updated_at = ?")
-    values.append(now)
+    values = [float(data[key]) if key == "amount" else data[key] for key in keys]
     values.append(entry_id)
     with get_db() as conn:
-        conn.execute(f"UPDATE rental_entries SET {', '.join(fields)} WHERE id = ?", values)
+        conn.execute(_update_sql("rental_entries", keys), values)
     return True
 
 
@@ -266,14 +429,13 @@ def delete_rental_entry(entry_id):
 
 
 def get_rental_entry(entry_id):
-    with get_db() as conn:
-        row = conn.execute("SELECT * FROM rental_entries WHERE id = ?", (entry_id,)).fetchone()
-        return dict(row) if row else None
+    with get_read_db() as conn:
+        return conn.execute("SELECT * FROM rental_entries WHERE id = ?", (entry_id,)).fetchone()
 
 
 def get_rental_entries_by_week(week_start, week_end=None):
     """Get all rental entries for a specific week."""
-    with get_db() as conn:
+    with get_read_db() as conn:
         if week_end:
             rows = conn.execute(
                 "SELECT * FROM rental_entries WHERE week_start = ? AND week_end = ? ORDER BY therapist",
@@ -284,36 +446,32 @@ def get_rental_entries_by_week(week_start, week_end=None):
                 "SELECT * FROM rental_entries WHERE week_start = ? ORDER BY therapist",
                 (week_start,)
             ).fetchall()
-        return [dict(r) for r in rows]
+        return rows
 
 
 def get_recent_rental_entries(weeks=12):
     """Get rental entries from the last N weeks."""
     cutoff = (datetime.now() - timedelta(weeks=weeks)).strftime("%Y-%m-%d")
-    with get_db() as conn:
+    with get_read_db() as conn:
         rows = conn.execute(
             "SELECT * FROM rental_entries WHERE week_start >= ? ORDER BY week_start DESC, therapist",
             (cutoff,)
         ).fetchall()
-        return [dict(r) for r in rows]
+        return rows
 
 
 def get_rental_weeks():
     """Get distinct weeks that have rental entries."""
-    with get_db() as conn:
-        rows = conn.execute(
+    with get_read_db() as conn:
+        return conn.execute(
             "SELECT DISTINCT week_start, week_end FROM rental_entries ORDER BY week_start DESC"
         ).fetchall()
-        return [{"week_start": r["week_start"], "week_end": r["week_end"]} for r in rows]
 
 
 def get_all_rental_entries():
-    """Get ALL rental entries for dashboard merging."""
-    with get_db() as conn:
-        rows = conn.execute(
-            "SELECT * FROM rental_entries ORDER BY week_start ASC, therapist"
-        ).fetchall()
-    return [dict(r) for r in rows]
+    """Yield ALL rental entries for dashboard merging."""
+    with get_read_db() as conn:
+        yield from conn.execute("SELECT * FROM rental_entries ORDER BY week_start ASC, therapist")
 
 def delete_rental_week(week_start, week_end):
     """Delete all entries for a specific week."""
@@ -329,7 +487,6 @@ def delete_rental_week(week_start, week_end):
 
 def init_cache_db():
     """Create data_cache table for storing pre-computed dashboard JSON."""
-    _ensure_dir()
     with get_db() as conn:
         conn.execute("""
             CREATE TABLE IF NOT EXISTS data_cache (
@@ -358,7 +515,7 @@ def save_data_cache(json_str):
 def load_data_cache():
     """Load cached dashboard data from SQLite. Returns (json_str, timestamp) or (None, None)."""
     try:
-        with get_db() as conn:
+        with get_read_db() as conn:
             row = conn.execute(
                 "SELECT data, updated_at FROM data_cache WHERE key = ?",
                 ("dashboard",)